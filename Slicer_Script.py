@@ -1,83 +1,41 @@
-import subprocess
 import os
 import sys
 
+import launcher
 
-def Start_Slicer(model_name,tumor_data):
-    slicer_executable = r"C:\Program Files\slicer.org\Slicer 5.8.0\Slicer.exe"
-    if os.path.exists(slicer_executable):
+
+def _launch_slicer(script_path, script_args):
+    try:
+        launch = launcher.launch("slicer", ["--no-splash", "--python-script", script_path] + script_args)
         try:
-            print("3D Slicer is starting...")
-            tumor_script_path = r"create_tumors.py"
-
-            subprocess.Popen([
-                slicer_executable,
-                "--no-splash",
-                "--python-script", tumor_script_path,
-                model_name + "~" + tumor_data
-            ])
-        except Exception as e:
-            print(f"Error while launching 3D Slicer: {e}")
-    else:
-        print(f"Slicer executable not found at {slicer_executable}")
+            launch.wait_started(timeout=1)
+        except TimeoutError:
+            # All Slicer slots on this machine are taken, wait for one to free up
+            print("Waiting for another 3D Slicer instance to close...")
+            launch.wait_started()
+    except FileNotFoundError as e:
+        print(e)
+    except Exception as e:
+        print(f"Error while launching 3D Slicer: {e}")
+
+
+def Start_Slicer(model_name,tumor_data):
+    print("3D Slicer is starting...")
+    _launch_slicer(r"create_tumors.py", [model_name + "~" + tumor_data])
 
 def Start_Slicer_Import(file_path):
-    slicer_executable = r"C:\Program Files\slicer.org\Slicer 5.8.0\Slicer.exe"
-    if os.path.exists(slicer_executable):
-        try:
-            print("3D Slicer is attempting import...")
-            tumor_script_path = r"load_tumour.py"
-
-            subprocess.Popen([
-                slicer_executable,
-                "--no-splash",
-                "--python-script", tumor_script_path,
-                file_path
-            ])
-        except Exception as e:
-            print(f"Error while launching 3D Slicer: {e}")
-    else:
-        print(f"Slicer executable not found at {slicer_executable}")
+    print("3D Slicer is attempting import...")
+    _launch_slicer(r"load_tumour.py", [file_path])
 
 def Start_Slicer_DICOM(folder_path):
-    slicer_executable = r"C:\Program Files\slicer.org\Slicer 5.8.0\Slicer.exe"
-    if os.path.exists(slicer_executable):
-        try:
-            print("3D Slicer is loading DICOM folder...")
-            dicom_script = r"load_dicom.py"
-
-            subprocess.Popen([
-                slicer_executable,
-                "--no-splash",
-                "--python-script", dicom_script,
-                folder_path
-            ])
-        except Exception as e:
-            print(f"Error while launching 3D Slicer: {e}")
-    else:
-        print(f"Slicer executable not found at {slicer_executable}")
+    print("3D Slicer is loading DICOM folder...")
+    _launch_slicer(r"load_dicom.py", [folder_path])
 
 def Start_Slicer_Nifti(nifti_path):
-    import os
-
-    slicer_executable = r"C:\Program Files\slicer.org\Slicer 5.8.0\Slicer.exe" # Path to Slicer exe file. Change if saved in a different location
-
     if os.path.isdir(nifti_path):
-        subprocess.Popen([
-            slicer_executable,
-            "--no-splash",
-            "--python-script", "load_nifti.py",
-            "--",
-            "--folder", nifti_path
-        ])
+        _launch_slicer("load_nifti.py", ["--", "--folder", nifti_path])
     else:
-        subprocess.Popen([
-            slicer_executable,
-            "--no-splash",
-            "--python-script", "load_nifti.py",
-            "--",
-            "--file", nifti_path
-        ])
+        _launch_slicer("load_nifti.py", ["--", "--file", nifti_path])
 
 
 
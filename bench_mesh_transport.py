@@ -0,0 +1,127 @@
+"""Compare ways of handing a mesh to a worker process.
+
+  pickle  arrays sent through a multiprocessing pipe
+  obj     OBJ file written to disk and parsed by the worker
+  shm     mesh_transport: arrays published to shared memory, worker attaches
+
+Times are from the start of the hand-off until the worker has the arrays and
+has read all of them. Usage: python bench_mesh_transport.py [--sizes 1e6,1e7]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import mesh_export
+import mesh_transport
+
+
+def make_mesh(triangle_count):
+    """A flat grid of about triangle_count triangles, float32 vertices and int64 faces like VTK."""
+    cols = max(int((triangle_count / 2) ** 0.5), 1)
+    rows = max(triangle_count // (2 * cols), 1)
+    x, y = np.meshgrid(np.arange(cols + 1, dtype=np.float32), np.arange(rows + 1, dtype=np.float32))
+    vertices = np.stack([x.ravel(), y.ravel(), np.zeros(x.size, dtype=np.float32)], axis=1)
+
+    index = np.arange((rows + 1) * (cols + 1), dtype=np.int64).reshape(rows + 1, cols + 1)
+    a, b = index[:-1, :-1].ravel(), index[:-1, 1:].ravel()
+    c, d = index[1:, 1:].ravel(), index[1:, :-1].ravel()
+    faces = np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)])
+    return vertices, faces
+
+
+def write_obj(path, vertices, faces):
+    with open(path, "w") as f:
+        mesh_export.write_obj_vertices(f, vertices)
+        mesh_export.write_obj_faces(f, faces, 0)
+
+
+def read_obj(path):
+    def lines(prefix):
+        with open(path) as f:
+            for line in f:
+                if line.startswith(prefix):
+                    yield line
+
+    vertices = np.loadtxt(lines("v "), usecols=(1, 2, 3), dtype=np.float32, ndmin=2)
+    faces = np.loadtxt(lines("f "), usecols=(1, 2, 3), dtype=np.int64, ndmin=2) - 1
+    return vertices, faces
+
+
+def _probe(vertices, faces):
+    # Read every element, so a method that maps memory lazily pays for it too
+    return float(vertices.sum()) + int(faces.max())
+
+
+def worker(conn):
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        method, payload = message
+        if method == "pickle":
+            vertices, faces = payload
+            conn.send(_probe(vertices, faces))
+        elif method == "obj":
+            vertices, faces = read_obj(payload)
+            conn.send(_probe(vertices, faces))
+        elif method == "shm":
+            mesh = mesh_transport.attach(payload)
+            result = _probe(mesh.vertices, mesh.faces)
+            mesh.release()
+            conn.send(result)
+
+
+def run(conn, method, vertices, faces, obj_path):
+    start = time.perf_counter()
+    if method == "pickle":
+        conn.send(("pickle", (vertices, faces)))
+        conn.recv()
+    elif method == "obj":
+        write_obj(obj_path, vertices, faces)
+        conn.send(("obj", obj_path))
+        conn.recv()
+    elif method == "shm":
+        mesh = mesh_transport.publish(vertices, faces)
+        conn.send(("shm", mesh.handle))
+        conn.recv()
+        mesh.release()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1e6,1e7", help="Comma separated triangle counts")
+    parser.add_argument("--methods", default="pickle,obj,shm")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs is reported")
+    args = parser.parse_args()
+
+    sizes = [int(float(s)) for s in args.sizes.split(",")]
+    methods = args.methods.split(",")
+
+    context = multiprocessing.get_context("spawn")
+    conn, child_conn = context.Pipe()
+    process = context.Process(target=worker, args=(child_conn,), daemon=True)
+    process.start()
+
+    obj_path = os.path.join(tempfile.gettempdir(), f"bench_mesh_transport_{os.getpid()}.obj")
+    print(f"{'triangles':>12} {'MB':>8} {'method':>8} {'seconds':>10} {'MB/s':>10}")
+    try:
+        for size in sizes:
+            vertices, faces = make_mesh(size)
+            megabytes = (vertices.nbytes + faces.nbytes) / 1e6
+            for method in methods:
+                best = min(run(conn, method, vertices, faces, obj_path) for _ in range(args.repeat))
+                print(f"{len(faces):>12} {megabytes:>8.1f} {method:>8} {best:>10.4f} {megabytes / best:>10.1f}")
+    finally:
+        conn.send(None)
+        process.join()
+        if os.path.exists(obj_path):
+            os.remove(obj_path)
+
+
+if __name__ == "__main__":
+    main()
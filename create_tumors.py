@@ -2,9 +2,16 @@ import sys
 import vtk
 import slicer
 import os
-import subprocess
 from qt import QWidget, QPushButton, QVBoxLayout, QLabel, Qt
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Let Slicer find the helper modules
+import mesh_export
+import mesh_metrics
+import unity_queue
+
+# Radii and centre of each tumor as created, for the closed-form metrics
+created_tumors = []
+
 class SaveDialog(QWidget):
     """A non-blocking floating window with a 'Save and Continue' button."""
     def __init__(self):
@@ -68,6 +75,7 @@ def create_tumor(x_radius, y_radius, z_radius, x_pos, y_pos, z_pos, index):
     # Apply the transformation to lock the position
     slicer.vtkSlicerTransformLogic().hardenTransform(model_node)
 
+    created_tumors.append(((x_radius, y_radius, z_radius), (x_pos, y_pos, z_pos)))
     print(f"Tumor {index} created at ({x_pos}, {y_pos}, {z_pos}) with size ({x_radius}, {y_radius}, {z_radius})")
 
 
@@ -117,6 +125,10 @@ def save_and_continue():
 
     if success:
         print(f"Project saved successfully as {save_path}")
+        # Exact values for the tumors as created, before any edits made in Slicer
+        analytic = [mesh_metrics.ellipsoid_metrics(*radii, mesh_export.to_lps(centre).tolist())
+                    for radii, centre in created_tumors]
+        mesh_metrics.write_polydata_report(append_filter.GetOutput(), save_path, analytic=analytic)
     else:
         print("Failed to save project.")
 
@@ -125,18 +137,13 @@ def save_and_continue():
 
 
 def open_unity_project(project_path, save_path):
-    unity_executable = r"C:\Program Files\Unity\Hub\Editor\2022.3.15f1\Editor\Unity.exe"
-    execute_method = "ImportObj.ImportObjFile"
-
-    # Add --filePath as an argument
-    cmd = f'"{unity_executable}" -projectPath "{project_path}" -executeMethod {execute_method} --filePath "{save_path}"'
-
-    print(f"Launching Unity project at {project_path} with method {execute_method} and file {save_path}...")
+    print(f"Queueing {save_path} for import into Unity project at {project_path}...")
 
     try:
-        subprocess.Popen(cmd, shell=True)
+        # Exports queued within a short window are handed to Unity together
+        unity_queue.enqueue_obj(save_path, project_path)
     except Exception as e:
-        print(f"Failed to launch Unity project: {e}")
+        print(f"Failed to queue file for Unity: {e}")
 
 # Read tumor data from Slicer script
 if len(sys.argv) < 2:
@@ -0,0 +1,66 @@
+import os
+import sys
+from contextlib import contextmanager
+
+if sys.platform.startswith("win"):
+    import ctypes
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def locked(lock_path):
+    """Hold an exclusive lock on lock_path, shared by every process on the machine."""
+    with open(lock_path, "a+b") as f:
+        if sys.platform.startswith("win"):
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def pid_alive(pid):
+    """True if a process with this PID is running."""
+    if pid <= 0:
+        return False
+    if sys.platform.startswith("win"):
+        # os.kill would terminate the process on Windows, ask for its exit code instead
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        kernel32.CloseHandle(handle)
+        return exit_code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_pid(path):
+    """PID stored in a small state file, or 0 if the file is missing or empty."""
+    try:
+        with open(path) as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def write_pid(path, pid):
+    with open(path, "w") as f:
+        f.write(str(pid))
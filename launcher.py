@@ -0,0 +1,353 @@
+import glob
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import interprocess
+
+
+# Per-tool lookup data. Each tool is resolved from, in order: launcher_config.json,
+# the environment variable, PATH, then the standard install roots below.
+TOOLS = {
+    "slicer": {
+        "env": "SLICER_EXECUTABLE",
+        "names": ["Slicer", "Slicer.exe"],
+        "patterns": {
+            "win32": [
+                r"C:\Program Files\slicer.org\Slicer *\Slicer.exe",
+                os.path.join(os.path.expanduser("~"), "AppData", "Local", "slicer.org", "Slicer *", "Slicer.exe"),
+            ],
+            "darwin": [
+                "/Applications/Slicer*.app/Contents/MacOS/Slicer",
+            ],
+            "linux": [
+                "/opt/Slicer*/Slicer",
+                "/usr/local/Slicer*/Slicer",
+                os.path.join(os.path.expanduser("~"), "Slicer*", "Slicer"),
+            ],
+        },
+    },
+    "unity": {
+        "env": "UNITY_EXECUTABLE",
+        "names": ["Unity", "Unity.exe"],
+        "patterns": {
+            "win32": [
+                r"C:\Program Files\Unity\Hub\Editor\*\Editor\Unity.exe",
+            ],
+            "darwin": [
+                "/Applications/Unity/Hub/Editor/*/Unity.app/Contents/MacOS/Unity",
+            ],
+            "linux": [
+                os.path.join(os.path.expanduser("~"), "Unity", "Hub", "Editor", "*", "Editor", "Unity"),
+                "/opt/unity/Editor/*/Editor/Unity",
+                "/opt/Unity/Editor/Unity",
+            ],
+        },
+    },
+}
+
+# Maximum number of instances of each tool running at once on this machine.
+# Further launches, from any process, wait in a queue until an instance exits.
+DEFAULT_MAX_INSTANCES = {"slicer": 2, "unity": 1}
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "launcher_config.json")
+
+# Slot, queue and metrics files shared by every process that launches tools
+STATE_DIR = os.environ.get("LAUNCHER_STATE_DIR", os.path.join(tempfile.gettempdir(), "ablation_launcher"))
+POLL_INTERVAL = 0.1  # seconds between checks for a free slot
+
+_executable_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_config(path=None):
+    """Read the optional launcher config. Returns an empty dict if there is none."""
+    path = path or CONFIG_PATH
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable launcher config {path}: {e}")
+        return {}
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _platform_key():
+    if sys.platform.startswith("win"):
+        return "win32"
+    if sys.platform == "darwin":
+        return "darwin"
+    return "linux"
+
+
+def _version_key(path):
+    # Sort install folders like "Slicer 5.10.0" after "Slicer 5.8.0"
+    parts = []
+    for chunk in path.replace("-", ".").replace(" ", ".").split("."):
+        parts.append((0, int(chunk), "") if chunk.isdigit() else (1, 0, chunk))
+    return parts
+
+
+def _search_install_roots(tool):
+    for pattern in TOOLS[tool]["patterns"].get(_platform_key(), []):
+        matches = [m for m in glob.glob(pattern) if _is_executable(m)]
+        if matches:
+            # Prefer the newest installed version
+            return sorted(matches, key=_version_key)[-1]
+    return None
+
+
+def find_executable(tool, config=None):
+    """Locate the executable for a tool ("slicer" or "unity"). Returns None if not found.
+
+    The result is cached, so the filesystem is only searched once per process.
+    """
+    if tool not in TOOLS:
+        raise ValueError(f"Unknown tool: {tool}")
+
+    with _cache_lock:
+        if tool in _executable_cache:
+            return _executable_cache[tool]
+
+    if config is None:
+        config = load_config()
+
+    candidates = [config.get(tool), os.environ.get(TOOLS[tool]["env"])]
+    candidates += [shutil.which(name) for name in TOOLS[tool]["names"]]
+
+    path = next((c for c in candidates if _is_executable(c)), None)
+    if path is None:
+        path = _search_install_roots(tool)
+
+    if path is not None:
+        with _cache_lock:
+            _executable_cache[tool] = path
+    return path
+
+
+def clear_cache():
+    """Forget resolved executable locations, e.g. after the config has changed."""
+    with _cache_lock:
+        _executable_cache.clear()
+
+
+class Launch:
+    """A queued or running launch of a tool. Returned by LauncherPool.submit."""
+    def __init__(self, tool, argv, popen_kwargs, ticket):
+        self.tool = tool
+        self.argv = argv
+        self.popen_kwargs = popen_kwargs
+        self.ticket = ticket  # queue file that holds this launch's place in line
+        self.process = None
+        self.error = None
+        self.submitted_at = time.monotonic()
+        self.queue_wait = None  # seconds spent waiting for a free slot
+        self.spawn_latency = None  # seconds spent in Popen
+        self._started = threading.Event()
+
+    def wait_started(self, timeout=None):
+        """Block until the process has been spawned (or failed to spawn).
+
+        Returns the Popen object. Raises the spawn error if launching failed.
+        """
+        if not self._started.wait(timeout):
+            raise TimeoutError(f"{self.tool} launch still queued after {timeout} seconds")
+        if self.error is not None:
+            raise self.error
+        return self.process
+
+
+class LauncherPool:
+    """Spawns tools without a shell while capping how many of each run at once.
+
+    The cap holds across processes: each running instance owns a slot file in
+    state_dir holding its PID, and waiting launches hold a queue file named by
+    submission time, so launches start in submission order whichever process made
+    them. Slots and queue entries of processes that died are reclaimed. Latency
+    figures are accumulated in state_dir too, see metrics().
+    """
+    _tickets = itertools.count()
+
+    def __init__(self, max_instances=None, state_dir=None):
+        self.max_instances = dict(DEFAULT_MAX_INSTANCES)
+        self.max_instances.update(load_config().get("max_instances", {}))
+        if max_instances:
+            self.max_instances.update(max_instances)
+        self.state_dir = state_dir or STATE_DIR
+        os.makedirs(self.state_dir, exist_ok=True)
+
+    def _path(self, name):
+        return os.path.join(self.state_dir, name)
+
+    def submit(self, tool, args, **popen_kwargs):
+        """Queue a launch of tool with the given argument list and return its Launch."""
+        executable = find_executable(tool)
+        if executable is None:
+            raise FileNotFoundError(f"{tool} executable not found. Set {TOOLS[tool]['env']} "
+                                    f"or add it to {CONFIG_PATH}")
+
+        # Queue files sort by submission time, which gives the launch order
+        ticket = self._path(f"{tool}.queue-{time.time_ns():020d}-{os.getpid()}-{next(self._tickets)}")
+        with interprocess.locked(self._path(f"{tool}.lock")):
+            interprocess.write_pid(ticket, os.getpid())
+
+        launch = Launch(tool, [executable] + list(args), popen_kwargs, ticket)
+        threading.Thread(target=self._run, args=(launch,), daemon=True).start()
+        return launch
+
+    def _live_files(self, tool, kind):
+        # Caller holds the tool lock. Removes files left behind by processes that died.
+        prefix = f"{tool}.{kind}-"
+        live = []
+        for name in sorted(os.listdir(self.state_dir)):
+            if not name.startswith(prefix):
+                continue
+            path = self._path(name)
+            if interprocess.pid_alive(interprocess.read_pid(path)):
+                live.append(path)
+            else:
+                os.remove(path)
+        return live
+
+    def _claim_slot(self, launch):
+        tool = launch.tool
+        cap = self.max_instances.get(tool, 1)
+        while True:
+            with interprocess.locked(self._path(f"{tool}.lock")):
+                queue = self._live_files(tool, "queue")
+                if queue and queue[0] == launch.ticket:
+                    taken = set(self._live_files(tool, "slot"))
+                    for index in range(cap):
+                        slot = self._path(f"{tool}.slot-{index}")
+                        if slot not in taken:
+                            # Held by this process until the child's PID replaces it
+                            interprocess.write_pid(slot, os.getpid())
+                            os.remove(launch.ticket)
+                            return slot
+            time.sleep(POLL_INTERVAL)
+
+    def _release_slot(self, tool, slot, *pids):
+        with interprocess.locked(self._path(f"{tool}.lock")):
+            if interprocess.read_pid(slot) in pids:
+                os.remove(slot)
+
+    def _abandon(self, launch, slot):
+        """Give up the queue place and slot of a launch that failed before its tool started."""
+        try:
+            with interprocess.locked(self._path(f"{launch.tool}.lock")):
+                if os.path.exists(launch.ticket):
+                    os.remove(launch.ticket)
+                if slot is not None and interprocess.read_pid(slot) == os.getpid():
+                    os.remove(slot)
+        except OSError as e:
+            print(f"Failed to clean up {launch.tool} launch state: {e}")
+
+    def _run(self, launch):
+        slot = None
+        try:
+            slot = self._claim_slot(launch)
+            started = time.monotonic()
+            launch.queue_wait = started - launch.submitted_at
+            try:
+                launch.process = subprocess.Popen(launch.argv, **launch.popen_kwargs)
+            finally:
+                launch.spawn_latency = time.monotonic() - started
+            # The slot stays taken while the tool runs, even after this process exits
+            with interprocess.locked(self._path(f"{launch.tool}.lock")):
+                interprocess.write_pid(slot, launch.process.pid)
+        except Exception as e:
+            if launch.process is None:
+                launch.error = e
+                self._abandon(launch, slot)
+            else:
+                # The tool is running, the slot just still holds this process's PID
+                print(f"Failed to hand the {launch.tool} slot to the running tool: {e}")
+        finally:
+            try:
+                self._record(launch)
+            except Exception as e:
+                print(f"Failed to record {launch.tool} launch metrics: {e}")
+            # Always wake up the caller, or it would wait forever
+            launch._started.set()
+
+        if launch.process is not None:
+            launch.process.wait()
+            self._release_slot(launch.tool, slot, launch.process.pid, os.getpid())
+
+    def _record(self, launch):
+        path = self._path("metrics.json")
+        with interprocess.locked(self._path("metrics.lock")):
+            try:
+                with open(path) as f:
+                    all_stats = json.load(f)
+            except (OSError, ValueError):
+                all_stats = {}
+            stats = all_stats.setdefault(launch.tool, {
+                "launched": 0, "failed": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0,
+                "spawn_latency_total": 0.0, "spawn_latency_max": 0.0})
+            if launch.error is None:
+                stats["launched"] += 1
+                stats["queue_wait_total"] += launch.queue_wait
+                stats["queue_wait_max"] = max(stats["queue_wait_max"], launch.queue_wait)
+                stats["spawn_latency_total"] += launch.spawn_latency
+                stats["spawn_latency_max"] = max(stats["spawn_latency_max"], launch.spawn_latency)
+            else:
+                stats["failed"] += 1
+            with open(path, "w") as f:
+                json.dump(all_stats, f)
+
+    def metrics(self):
+        """Launch counts and latencies (in seconds) for each tool, across all processes."""
+        with interprocess.locked(self._path("metrics.lock")):
+            try:
+                with open(self._path("metrics.json")) as f:
+                    all_stats = json.load(f)
+            except (OSError, ValueError):
+                all_stats = {}
+
+        result = {}
+        for tool in TOOLS:
+            stats = all_stats.get(tool, {})
+            launched = stats.get("launched", 0)
+            with interprocess.locked(self._path(f"{tool}.lock")):
+                running = len(self._live_files(tool, "slot"))
+                queued = len(self._live_files(tool, "queue"))
+            result[tool] = {
+                "launched": launched,
+                "failed": stats.get("failed", 0),
+                "running": running,
+                "queued": queued,
+                "queue_wait_mean": stats.get("queue_wait_total", 0.0) / launched if launched else 0.0,
+                "queue_wait_max": stats.get("queue_wait_max", 0.0),
+                "spawn_latency_mean": stats.get("spawn_latency_total", 0.0) / launched if launched else 0.0,
+                "spawn_latency_max": stats.get("spawn_latency_max", 0.0),
+            }
+        return result
+
+
+_default_pool = None
+
+
+def get_pool():
+    """Return the process-wide LauncherPool, creating it on first use."""
+    global _default_pool
+    with _cache_lock:
+        if _default_pool is None:
+            _default_pool = LauncherPool()
+        return _default_pool
+
+
+def launch(tool, args, **popen_kwargs):
+    """Queue a launch on the process-wide pool. See LauncherPool.submit."""
+    return get_pool().submit(tool, args, **popen_kwargs)
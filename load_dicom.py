@@ -1,12 +1,15 @@
 import sys
 import os
 import slicer
-import subprocess
 import vtk
 from DICOMLib import DICOMUtils
 from qt import QWidget, QPushButton, QVBoxLayout, QLabel, Qt, QTimer
 import vtkSegmentationCorePython as vtkSegmentationCore
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Let Slicer find the helper modules
+import mesh_metrics
+import unity_queue
+
 # Input
 dicom_folder = sys.argv[1]
 model_name = sys.argv[2] if len(sys.argv) > 2 else "TumorModel"
@@ -16,7 +19,6 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 obj_output_dir = os.path.join(script_dir, "Obj_files")
 os.makedirs(obj_output_dir, exist_ok=True)
 unity_project_path = os.path.join(script_dir, "Unity", "FYP_Testing")
-unity_executable = r"C:\Program Files\Unity\Hub\Editor\2022.3.15f1\Editor\Unity.exe" # Path to Unity exe file. Change if needed
 
 # DICOM DB init
 dicomDatabaseDir = os.path.join(slicer.app.temporaryPath, "DICOM")
@@ -118,6 +120,8 @@ def export_segmentation_to_obj():
                 saved = slicer.util.saveNode(model_node, obj_path)
                 if saved:
                     print(f"Saved .obj to: {obj_path}")
+                    # QA metrics, computed while the centred model is still in memory
+                    mesh_metrics.write_polydata_report(model_node.GetPolyData(), obj_path)
                     SaveDialog(obj_path)
                     return  # stop after first successful export
                 else:
@@ -154,15 +158,13 @@ class SaveDialog(QWidget):
         open_unity_project(self.obj_path)
         self.close()
 
-# Unity launcher
+# Unity hand-off
 def open_unity_project(obj_path):
-    execute_method = "ImportObj.ImportObjFile"
-    cmd = f'"{unity_executable}" -projectPath "{unity_project_path}" -executeMethod {execute_method} --filePath "{obj_path}"'
-    print(f"Launching Unity: {cmd}")
+    print(f"Queueing for Unity: {obj_path}")
     try:
-        subprocess.Popen(cmd, shell=True)
+        unity_queue.enqueue_obj(obj_path, unity_project_path)
     except Exception as e:
-        print(f"Unity launch failed: {e}")
+        print(f"Unity queueing failed: {e}")
 
 # Run
 QTimer.singleShot(1000, import_and_process_dicom)
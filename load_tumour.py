@@ -2,9 +2,13 @@ import sys
 import vtk
 import slicer
 import os
-import subprocess
 from qt import QWidget, QPushButton, QVBoxLayout, QLabel, Qt
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))  # Let Slicer find the helper modules
+import mesh_export
+import mesh_metrics
+import unity_queue
+
 
 class SaveDialog(QWidget):
     """A non-blocking floating window with a 'Save and Continue' button."""
@@ -51,58 +55,60 @@ def save_and_continue():
         print(model.GetName())
     # Values in the models that I don't want to merge
     ignore_fields = ["Red Volume Slice", "Green Volume Slice", "Yellow Volume Slice"]
-    # Create an append filter to merge all tumors
-    append_filter = vtk.vtkAppendPolyData()
 
-    for model in all_models:
-        if model.GetName() not in ignore_fields: # Must look if ther is a better way
-            # Apply transformation before merging
-            transform_node = model.GetParentTransformNode()
-            if transform_node:
-                slicer.vtkSlicerTransformLogic().hardenTransform(model)
-
-            poly_data = model.GetPolyData()
-            if poly_data:
-                append_filter.AddInputData(poly_data)
-
-    append_filter.Update()
-
-    # Create a new merged model
-    merged_model_node = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLModelNode", "Merged_Tumor_Model")
-    merged_model_node.SetAndObservePolyData(append_filter.GetOutput())
-
-    # Assign a display node to ensure visibility
-    display_node = slicer.mrmlScene.AddNewNodeByClass("vtkMRMLModelDisplayNode")
-    merged_model_node.SetAndObserveDisplayNodeID(display_node.GetID())
-    display_node.SetVisibility(True)
-    display_node.SetColor(0.8, 0.2, 0.2)  # Tumor color (dark red)
-    display_node.SetOpacity(0.9)  # Semi-transparent
-
-    # Save the merged model as a single OBJ file
-    success = slicer.util.saveNode(merged_model_node, save_path)
-
-    if success:
-        print(f"Project saved successfully as {save_path}")
+    def scene_poly_data():
+        for model in all_models:
+            if model.GetName() not in ignore_fields: # Must look if ther is a better way
+                # Apply transformation before merging
+                transform_node = model.GetParentTransformNode()
+                if transform_node:
+                    slicer.vtkSlicerTransformLogic().hardenTransform(model)
+
+                poly_data = model.GetPolyData()
+                if poly_data:
+                    yield poly_data
+
+    # Stream the models into a single OBJ file one at a time instead of building
+    # the merged model in memory
+    model_metrics = []
+
+    def collect_metrics(points, triangles):
+        # QA metrics must never abort the export itself
+        try:
+            model_metrics.append(mesh_metrics.mesh_metrics(points, triangles))
+        except Exception as e:
+            print(f"Failed to compute metrics for model {len(model_metrics) + 1}: {e}")
+            model_metrics.append(None)
+
+    try:
+        mesh_count = mesh_export.stream_polydata_to_obj(scene_poly_data(), save_path, on_mesh=collect_metrics)
+        print(f"Project saved successfully as {save_path} ({mesh_count} models)")
+    except Exception as e:
+        print(f"Failed to save project: {e}")
+        return
+
+    if None in model_metrics:
+        print("Metrics not saved, some models could not be measured")
     else:
-        print("Failed to save project.")
+        try:
+            metrics_path = mesh_metrics.write_sidecar(save_path, mesh_metrics.combine_metrics(model_metrics),
+                                                      models=model_metrics)
+            print(f"Metrics saved as {metrics_path}")
+        except Exception as e:
+            print(f"Failed to save metrics: {e}")
 
     print("Opening Unity...")
     open_unity_project(os.path.join(script_dir, "Unity", "FYP_Testing"), save_path)
 
 
 def open_unity_project(project_path, save_path):
-    unity_executable = r"C:\Program Files\Unity\Hub\Editor\2022.3.15f1\Editor\Unity.exe"
-    execute_method = "ImportObj.ImportObjFile"
-
-    # Add --filePath as an argument
-    cmd = f'"{unity_executable}" -projectPath "{project_path}" -executeMethod {execute_method} --filePath "{save_path}"'
-
-    print(f"Launching Unity project at {project_path} with method {execute_method} and file {save_path}...")
+    print(f"Queueing {save_path} for import into Unity project at {project_path}...")
 
     try:
-        subprocess.Popen(cmd, shell=True)
+        # Exports queued within a short window are handed to Unity together
+        unity_queue.enqueue_obj(save_path, project_path)
     except Exception as e:
-        print(f"Failed to launch Unity project: {e}")
+        print(f"Failed to queue file for Unity: {e}")
 
 
 # Read file path of obj file from Slicer script
@@ -1,4 +1,5 @@
 import subprocess
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 
@@ -114,19 +115,19 @@ class TumorPlanner:
                 return
 
         model_name = self.model_name_entry.get()
-        subprocess.run(["python", "Slicer_Script.py", "create", model_name, "|".join(tumor_data)])
+        subprocess.run([sys.executable, "Slicer_Script.py", "create", model_name, "|".join(tumor_data)])
         self.root.destroy()
 
     def on_load_tumour_click(self):
         file_path = filedialog.askopenfilename(filetypes=[("OBJ Files", "*.obj")])
         if file_path:
-            subprocess.run(["python", "Slicer_Script.py", "import", file_path])
+            subprocess.run([sys.executable, "Slicer_Script.py", "import", file_path])
             self.root.destroy()
 
     def on_load_dicom_click(self):
         folder_path = filedialog.askdirectory(title="Select DICOM Folder")
         if folder_path:
-            subprocess.run(["python", "Slicer_Script.py", "dicom", folder_path])
+            subprocess.run([sys.executable, "Slicer_Script.py", "dicom", folder_path])
             self.root.destroy()
 
     def on_load_nifti_click(self):
@@ -135,12 +136,12 @@ class TumorPlanner:
         if choice:
             folder_path = filedialog.askdirectory(title="Select Folder Containing volume-*.nii and segmentation-*.nii")
             if folder_path:
-                subprocess.run(["python", "Slicer_Script.py", "nifti_folder", folder_path])
+                subprocess.run([sys.executable, "Slicer_Script.py", "nifti_folder", folder_path])
                 self.root.destroy()
         else:
             file_path = filedialog.askopenfilename(filetypes=[("NIfTI Files", "*.nii *.nii.gz")])
             if file_path:
-                subprocess.run(["python", "Slicer_Script.py", "nifti", file_path])
+                subprocess.run([sys.executable, "Slicer_Script.py", "nifti", file_path])
                 self.root.destroy()
 
 
@@ -0,0 +1,120 @@
+import os
+
+import numpy as np
+
+CHUNK_ROWS = 100000  # rows formatted per write, bounds the size of the text buffer
+
+# Slicer works in RAS but saves models in LPS, flip x and y to match slicer.util.saveNode
+RAS_TO_LPS = np.array([-1.0, -1.0, 1.0])
+
+
+def polydata_arrays(poly_data):
+    """Return (points, triangles, normals) of a vtkPolyData as NumPy arrays.
+
+    Polygons and strips are triangulated first. normals is None when the polydata
+    has no point normals. Returns None if there is nothing to export.
+    """
+    import vtk
+    from vtk.util.numpy_support import vtk_to_numpy
+
+    if poly_data.GetPoints() is None or poly_data.GetNumberOfPolys() + poly_data.GetNumberOfStrips() == 0:
+        return None
+
+    offsets = vtk_to_numpy(poly_data.GetPolys().GetOffsetsArray())
+    if poly_data.GetNumberOfStrips() or np.any(np.diff(offsets) != 3):
+        triangle_filter = vtk.vtkTriangleFilter()
+        triangle_filter.SetInputData(poly_data)
+        triangle_filter.PassVertsOff()
+        triangle_filter.PassLinesOff()
+        triangle_filter.Update()
+        poly_data = triangle_filter.GetOutput()
+
+    points = vtk_to_numpy(poly_data.GetPoints().GetData())
+    triangles = vtk_to_numpy(poly_data.GetPolys().GetConnectivityArray()).reshape(-1, 3)
+    normals = poly_data.GetPointData().GetNormals()
+    if normals is not None:
+        normals = vtk_to_numpy(normals)
+    return points, triangles, normals
+
+
+def _write_rows(f, prefix, rows, row_format):
+    line_format = prefix + " " + row_format + "\n"
+    for start in range(0, len(rows), CHUNK_ROWS):
+        chunk = rows[start:start + CHUNK_ROWS]
+        f.write((line_format * len(chunk)) % tuple(chunk.ravel().tolist()))
+
+
+def to_lps(points):
+    """Copy of RAS points (or normals) converted to LPS."""
+    return np.asarray(points, dtype=np.float64) * RAS_TO_LPS
+
+
+def write_obj_vertices(f, points, prefix="v"):
+    """Write points as OBJ "v" (or "vn") lines."""
+    _write_rows(f, prefix, points, "%.6f %.6f %.6f")
+
+
+def write_obj_faces(f, triangles, vertex_offset, normal_offset=None):
+    """Write triangles as OBJ "f" lines.
+
+    Indices are local to one mesh, the offsets are the number of vertices (and
+    normals) already written to the file. Normal indices are only written when
+    normal_offset is given.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64)
+    for start in range(0, len(triangles), CHUNK_ROWS):
+        chunk = triangles[start:start + CHUNK_ROWS] + (vertex_offset + 1)
+        if normal_offset is None:
+            _write_rows(f, "f", chunk, "%d %d %d")
+        else:
+            normal_chunk = chunk + (normal_offset - vertex_offset)
+            _write_rows(f, "f", np.stack([chunk, normal_chunk], axis=2).reshape(-1, 6), "%d//%d %d//%d %d//%d")
+
+
+def stream_polydata_to_obj(poly_datas, save_path, on_mesh=None):
+    """Write a sequence of vtkPolyData into a single OBJ file, one mesh at a time.
+
+    The merged mesh is never built in memory, so poly_datas can be a generator and
+    peak memory is bounded by the largest single mesh. If given, on_mesh is called
+    with the LPS points and triangles of each mesh while they are in memory.
+    Returns the number of meshes written.
+    """
+    temp_path = save_path + ".part"
+    vertex_offset = 0
+    normal_offset = 0
+    mesh_count = 0
+
+    try:
+        with open(temp_path, "w") as f:
+            f.write("# Merged model, coordinates in LPS\n")
+            for poly_data in poly_datas:
+                arrays = polydata_arrays(poly_data)
+                if arrays is None:
+                    continue
+                points, triangles, normals = arrays
+                points = to_lps(points)
+
+                mesh_count += 1
+                f.write(f"g mesh_{mesh_count}\n")
+                write_obj_vertices(f, points)
+                if normals is not None:
+                    write_obj_vertices(f, to_lps(normals), prefix="vn")
+                    write_obj_faces(f, triangles, vertex_offset, normal_offset)
+                    normal_offset += len(normals)
+                else:
+                    write_obj_faces(f, triangles, vertex_offset)
+                vertex_offset += len(points)
+
+                if on_mesh is not None:
+                    on_mesh(points, triangles)
+    except BaseException:
+        # Do not leave a half written file behind
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+    # Only replace the old file once the new one is complete
+    os.replace(temp_path, save_path)
+    return mesh_count
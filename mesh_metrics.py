@@ -0,0 +1,182 @@
+import json
+import math
+import os
+
+import numpy as np
+
+import mesh_export
+
+CHUNK_TRIANGLES = 1000000  # triangles processed per step, bounds temporary arrays
+
+
+def _triangle_sums(points, triangles, origin):
+    """Signed volume, area and their first moments, accumulated over chunks of triangles."""
+    volume = 0.0
+    area = 0.0
+    volume_moment = np.zeros(3)
+    area_moment = np.zeros(3)
+    for start in range(0, len(triangles), CHUNK_TRIANGLES):
+        chunk = triangles[start:start + CHUNK_TRIANGLES]
+        # Shift to the bounding box centre so large coordinates do not lose precision
+        v0 = points[chunk[:, 0]] - origin
+        v1 = points[chunk[:, 1]] - origin
+        v2 = points[chunk[:, 2]] - origin
+
+        cross = np.cross(v1 - v0, v2 - v0)
+        triangle_areas = 0.5 * np.linalg.norm(cross, axis=1)
+        # Divergence theorem: each triangle spans a signed tetrahedron with the origin
+        tetra_volumes = np.einsum("ij,ij->i", v0, np.cross(v1, v2)) / 6.0
+
+        area += triangle_areas.sum()
+        volume += tetra_volumes.sum()
+        area_moment += triangle_areas @ ((v0 + v1 + v2) / 3.0)
+        volume_moment += tetra_volumes @ ((v0 + v1 + v2) / 4.0)
+    return volume, area, volume_moment, area_moment
+
+
+def component_count(triangles, point_count):
+    """Number of connected components, faces being connected through shared vertices.
+
+    Vectorized union-find: every pass hooks the larger root of each edge onto the
+    smaller one, then path compression flattens the trees until they are stars.
+    """
+    if len(triangles) == 0:
+        return 0
+    a = np.concatenate([triangles[:, 0], triangles[:, 1]])
+    b = np.concatenate([triangles[:, 1], triangles[:, 2]])
+    keep = a != b
+    a, b = a[keep], b[keep]
+
+    parent = np.arange(point_count)
+    while True:
+        root_a, root_b = parent[a], parent[b]
+        differ = root_a != root_b
+        if not differ.any():
+            break
+        low = np.minimum(root_a[differ], root_b[differ])
+        high = np.maximum(root_a[differ], root_b[differ])
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+
+    used = np.unique(triangles)
+    return int(np.unique(parent[used]).size)
+
+
+def mesh_metrics(points, triangles):
+    """Volume, surface area, bounding box, centroid and component count of a triangle mesh.
+
+    The volume is only meaningful for closed, consistently oriented surfaces. The
+    centroid is that of the enclosed volume, or of the surface if it encloses none.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    if len(points) == 0 or len(triangles) == 0:
+        return {"vertex_count": len(points), "triangle_count": len(triangles), "volume": 0.0,
+                "surface_area": 0.0, "bounding_box": None, "centroid": None, "component_count": 0}
+
+    bounds_min = points.min(axis=0)
+    bounds_max = points.max(axis=0)
+    origin = (bounds_min + bounds_max) / 2.0
+    volume, area, volume_moment, area_moment = _triangle_sums(points, triangles, origin)
+
+    if abs(volume) > 1e-12 * max(area, 1.0) ** 1.5:
+        centroid = origin + volume_moment / volume
+    elif area > 0:
+        centroid = origin + area_moment / area
+    else:
+        centroid = origin
+
+    return {
+        "vertex_count": len(points),
+        "triangle_count": len(triangles),
+        "volume": float(abs(volume)),
+        "surface_area": float(area),
+        "bounding_box": {"min": bounds_min.tolist(), "max": bounds_max.tolist()},
+        "centroid": centroid.tolist(),
+        "component_count": component_count(triangles, len(points)),
+    }
+
+
+def combine_metrics(parts):
+    """Metrics of several meshes written to one file, from the metrics of each mesh."""
+    parts = [p for p in parts if p["bounding_box"] is not None]
+    if not parts:
+        return mesh_metrics(np.empty((0, 3)), np.empty((0, 3)))
+
+    volume = sum(p["volume"] for p in parts)
+    area = sum(p["surface_area"] for p in parts)
+    if volume > 0:
+        centroid = sum(p["volume"] * np.array(p["centroid"]) for p in parts) / volume
+    else:
+        centroid = sum(p["surface_area"] * np.array(p["centroid"]) for p in parts) / max(area, 1e-300)
+
+    return {
+        "vertex_count": sum(p["vertex_count"] for p in parts),
+        "triangle_count": sum(p["triangle_count"] for p in parts),
+        "volume": volume,
+        "surface_area": area,
+        "bounding_box": {
+            "min": np.min([p["bounding_box"]["min"] for p in parts], axis=0).tolist(),
+            "max": np.max([p["bounding_box"]["max"] for p in parts], axis=0).tolist(),
+        },
+        "centroid": centroid.tolist(),
+        "component_count": sum(p["component_count"] for p in parts),
+    }
+
+
+def ellipsoid_metrics(x_radius, y_radius, z_radius, centre):
+    """Closed-form metrics of an ellipsoid like the ones create_tumor builds.
+
+    The surface area uses Thomsen's formula, which is within 1.1% of the exact value.
+    """
+    a, b, c = x_radius, y_radius, z_radius
+    p = 1.6075
+    area = 4.0 * math.pi * (((a * b) ** p + (a * c) ** p + (b * c) ** p) / 3.0) ** (1.0 / p)
+    centre = [float(v) for v in centre]
+    return {
+        "volume": 4.0 / 3.0 * math.pi * a * b * c,
+        "surface_area": area,
+        "bounding_box": {"min": [centre[0] - a, centre[1] - b, centre[2] - c],
+                         "max": [centre[0] + a, centre[1] + b, centre[2] + c]},
+        "centroid": centre,
+        "component_count": 1,
+    }
+
+
+def sidecar_path(obj_path):
+    return os.path.splitext(obj_path)[0] + ".metrics.json"
+
+
+def write_sidecar(obj_path, metrics, **extra):
+    """Write metrics as JSON next to the OBJ file (model.obj -> model.metrics.json)."""
+    report = {"obj": os.path.basename(obj_path), "coordinate_system": "LPS"}
+    report["metrics"] = metrics
+    report.update(extra)
+
+    path = sidecar_path(obj_path)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def write_polydata_report(poly_data, obj_path, **extra):
+    """Measure a vtkPolyData saved as obj_path and write the metrics sidecar.
+
+    Errors are printed rather than raised, so QA problems never fail an export.
+    Returns the sidecar path, or None if it could not be written.
+    """
+    try:
+        arrays = mesh_export.polydata_arrays(poly_data)
+        if arrays is None:
+            raise ValueError("model has no triangles")
+        points, triangles, _ = arrays
+        path = write_sidecar(obj_path, mesh_metrics(mesh_export.to_lps(points), triangles), **extra)
+    except Exception as e:
+        print(f"Failed to save metrics for {obj_path}: {e}")
+        return None
+    print(f"Metrics saved as {path}")
+    return path
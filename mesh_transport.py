@@ -0,0 +1,228 @@
+"""Share mesh arrays between processes without copying them.
+
+The publishing process copies the vertex and face arrays once into a shared
+memory block and passes the small MeshHandle to the workers (through a pipe, or
+as an argv string via to_token). Workers attach and get NumPy views onto the same
+memory. Every SharedMesh holds one reference; the block is removed when the last
+one is released.
+
+The block header lists the PID holding each reference. References are released
+when the SharedMesh is garbage collected or the process exits, and references of
+processes that died without either are reclaimed by the next attach or release.
+
+Views taken from .vertices and .faces stay valid after release(); the memory is
+unmapped in this process once the last of them is garbage collected.
+"""
+import json
+import os
+import sys
+import struct
+import tempfile
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import interprocess
+
+MAX_REFERENCES = 64
+OWNERS = struct.Struct(f"{MAX_REFERENCES}q")  # PID per reference, 0 for a free entry
+ALIGN = 64
+
+
+def _aligned(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _lock_path(name):
+    return os.path.join(tempfile.gettempdir(), f"{name}.lock")
+
+
+def _tracker_name(block):
+    # The name SharedMemory registers with the resource tracker, POSIX names start with a slash
+    return "/" + block.name
+
+
+def _open_block(name=None, size=0):
+    create = name is None
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+
+    block = shared_memory.SharedMemory(name=name, create=create, size=size)
+    if not sys.platform.startswith("win"):
+        # Lifetime is managed by the reference table. Left registered, the resource
+        # tracker would remove the block as soon as the first process using it exits.
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(_tracker_name(block), "shared_memory")
+    return block
+
+
+def _unlink_block(block):
+    if sys.version_info < (3, 13) and not sys.platform.startswith("win"):
+        # unlink() also unregisters from the resource tracker, register again to keep it balanced
+        from multiprocessing import resource_tracker
+        resource_tracker.register(_tracker_name(block), "shared_memory")
+    block.unlink()
+
+
+def _remove_lock(name):
+    try:
+        os.remove(_lock_path(name))
+    except OSError:
+        pass
+
+
+def _reap(owners):
+    """The owner table with the entries of processes that are gone freed."""
+    return [pid if pid and interprocess.pid_alive(pid) else 0 for pid in owners]
+
+
+def _release(block):
+    # Finalizer of SharedMesh, so it must not refer to the SharedMesh itself
+    with interprocess.locked(_lock_path(block.name)):
+        table = OWNERS.unpack_from(block.buf, 0)
+        owners = _reap(table)
+        if os.getpid() in owners:
+            owners[owners.index(os.getpid())] = 0
+        OWNERS.pack_into(block.buf, 0, *owners)
+        released = not any(owners)
+        # An empty table means another process already removed the block
+        if released and any(table):
+            _unlink_block(block)
+    if released:
+        _remove_lock(block.name)
+
+
+class _Buffer:
+    """Source of one NumPy view that keeps the block mapped while the view exists.
+
+    Views made from block.buf directly only reference the memoryview, so closing
+    the block would unmap memory they still point at. Here the views' base holds the
+    block, which SharedMemory closes once the last view is garbage collected.
+    """
+    def __init__(self, block, shape, dtype, offset):
+        self.block = block
+        address = np.frombuffer(block.buf, dtype=np.uint8).ctypes.data + offset
+        self.__array_interface__ = {"shape": tuple(shape), "typestr": dtype,
+                                    "data": (address, False), "version": 3}
+
+
+class MeshHandle:
+    """Describes where a published mesh lives. Small and cheap to pickle or pass as text."""
+    def __init__(self, name, vertex_shape, vertex_dtype, vertex_offset, face_shape, face_dtype, face_offset):
+        self.name = name
+        self.vertex_shape = tuple(vertex_shape)
+        self.vertex_dtype = vertex_dtype
+        self.vertex_offset = vertex_offset
+        self.face_shape = tuple(face_shape)
+        self.face_dtype = face_dtype
+        self.face_offset = face_offset
+
+    def to_token(self):
+        """Encode the handle as a string, e.g. for a script argument."""
+        return json.dumps(self.__dict__, separators=(",", ":"))
+
+    @classmethod
+    def from_token(cls, token):
+        return cls(**json.loads(token))
+
+
+class SharedMesh:
+    """One reference to a published mesh. Use publish() or attach() to get one."""
+    def __init__(self, handle, block):
+        self.handle = handle
+        self.vertices = np.asarray(_Buffer(block, handle.vertex_shape, handle.vertex_dtype, handle.vertex_offset))
+        self.faces = np.asarray(_Buffer(block, handle.face_shape, handle.face_dtype, handle.face_offset))
+        # Also runs when the SharedMesh is garbage collected or at interpreter exit
+        self._finalizer = weakref.finalize(self, _release, block)
+
+    def release(self):
+        """Drop this reference. The shared memory is removed with the last one."""
+        self.vertices = None
+        self.faces = None
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def publish(vertices, faces):
+    """Copy vertex and face arrays into shared memory.
+
+    Returns the publisher's SharedMesh. Pass its .handle to other processes and
+    release it once this process no longer needs the mesh.
+    """
+    vertices = np.ascontiguousarray(vertices)
+    faces = np.ascontiguousarray(faces)
+
+    vertex_offset = _aligned(OWNERS.size)
+    face_offset = _aligned(vertex_offset + vertices.nbytes)
+    block = _open_block(size=face_offset + faces.nbytes)
+    OWNERS.pack_into(block.buf, 0, os.getpid(), *[0] * (MAX_REFERENCES - 1))
+
+    handle = MeshHandle(block.name, vertices.shape, vertices.dtype.str, vertex_offset,
+                        faces.shape, faces.dtype.str, face_offset)
+    mesh = SharedMesh(handle, block)
+    mesh.vertices[...] = vertices
+    mesh.faces[...] = faces
+    return mesh
+
+
+def attach(handle):
+    """Attach to a published mesh without copying it. Accepts a MeshHandle or its token."""
+    if isinstance(handle, str):
+        handle = MeshHandle.from_token(handle)
+
+    block = _open_block(handle.name)
+    try:
+        with interprocess.locked(_lock_path(handle.name)):
+            table = OWNERS.unpack_from(block.buf, 0)
+            owners = _reap(table)
+            released = not any(owners)
+            if released:
+                # Either released while this process was opening the block, or every
+                # owner died without releasing and the block is left to remove here
+                if any(table):
+                    _unlink_block(block)
+            elif 0 in owners:
+                owners[owners.index(0)] = os.getpid()
+            else:
+                raise RuntimeError(f"Shared mesh {handle.name} already has {MAX_REFERENCES} references")
+            OWNERS.pack_into(block.buf, 0, *owners)
+    except BaseException:
+        block.close()
+        raise
+    if released:
+        block.close()
+        _remove_lock(handle.name)
+        raise FileNotFoundError(f"Shared mesh {handle.name} has already been released")
+    return SharedMesh(handle, block)
+
+
+def reclaim(handle):
+    """Free references held by dead processes and remove the mesh if none are left.
+
+    Returns the number of live references. Useful for a supervisor after a worker crashed.
+    """
+    if isinstance(handle, str):
+        handle = MeshHandle.from_token(handle)
+    try:
+        block = _open_block(handle.name)
+    except FileNotFoundError:
+        return 0
+    try:
+        with interprocess.locked(_lock_path(handle.name)):
+            table = OWNERS.unpack_from(block.buf, 0)
+            owners = _reap(table)
+            OWNERS.pack_into(block.buf, 0, *owners)
+            live = sum(1 for pid in owners if pid)
+            if live == 0 and any(table):
+                _unlink_block(block)
+    finally:
+        block.close()
+    if live == 0:
+        _remove_lock(handle.name)
+    return live
@@ -0,0 +1,38 @@
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import launcher  # noqa: E402
+
+if sys.platform.startswith("win"):
+    collect_ignore_glob = ["test_*.py"]  # the stub executables rely on shebang lines
+
+
+def make_stub(directory, name, body=""):
+    """Write an executable Python script standing in for Slicer or Unity."""
+    path = os.path.join(str(directory), name)
+    with open(path, "w") as f:
+        f.write(f"#!{sys.executable}\nimport sys, time\n{body}\n")
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+@pytest.fixture
+def isolated_launcher(tmp_path, monkeypatch):
+    """Point the launcher at an empty config, PATH and state directory."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setattr(launcher, "CONFIG_PATH", str(tmp_path / "launcher_config.json"))
+    monkeypatch.setattr(launcher, "STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(launcher, "_default_pool", None)
+    for tool in launcher.TOOLS:
+        monkeypatch.delenv(launcher.TOOLS[tool]["env"], raising=False)
+        monkeypatch.setitem(launcher.TOOLS[tool], "patterns", {})
+    monkeypatch.setenv("PATH", str(bin_dir))
+    launcher.clear_cache()
+    yield bin_dir
+    launcher.clear_cache()
@@ -0,0 +1,172 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import launcher
+from conftest import make_stub
+
+
+def wait_for_lines(path, count, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            with open(path) as f:
+                lines = f.read().split()
+            if len(lines) >= count:
+                return lines
+        time.sleep(0.05)
+    raise AssertionError(f"expected {count} lines in {path}")
+
+
+def logging_stub(directory, name, log_path, seconds):
+    log = f"open({str(log_path)!r}, 'a').write"
+    return make_stub(directory, name, f"{log}('start-' + sys.argv[1] + '\\n')\n"
+                                      f"time.sleep({seconds})\n"
+                                      f"{log}('end-' + sys.argv[1] + '\\n')")
+
+
+def test_resolution_order(isolated_launcher, tmp_path, monkeypatch):
+    on_path = make_stub(isolated_launcher, "Slicer")
+    from_env = make_stub(tmp_path, "env_slicer")
+    from_config = make_stub(tmp_path, "config_slicer")
+    install_root = tmp_path / "opt" / "Slicer-5.8.0"
+    install_root.mkdir(parents=True)
+    installed = make_stub(install_root, "Slicer")
+    monkeypatch.setitem(launcher.TOOLS["slicer"], "patterns",
+                        {launcher._platform_key(): [str(tmp_path / "opt" / "Slicer*" / "Slicer")]})
+
+    assert launcher.find_executable("slicer", config={"slicer": from_config}) == from_config
+    launcher.clear_cache()
+    monkeypatch.setenv("SLICER_EXECUTABLE", from_env)
+    assert launcher.find_executable("slicer", config={}) == from_env
+    launcher.clear_cache()
+    monkeypatch.delenv("SLICER_EXECUTABLE")
+    assert launcher.find_executable("slicer", config={}) == on_path
+    launcher.clear_cache()
+    os.remove(on_path)
+    assert launcher.find_executable("slicer", config={}) == installed
+    launcher.clear_cache()
+    os.remove(installed)
+    assert launcher.find_executable("slicer", config={}) is None
+
+
+def test_config_file_is_read(isolated_launcher, tmp_path):
+    stub = make_stub(tmp_path, "unity_stub")
+    with open(launcher.CONFIG_PATH, "w") as f:
+        json.dump({"unity": stub, "max_instances": {"unity": 3}}, f)
+
+    assert launcher.find_executable("unity") == stub
+    assert launcher.LauncherPool().max_instances["unity"] == 3
+
+
+def test_result_is_cached(isolated_launcher):
+    stub = make_stub(isolated_launcher, "Unity")
+    assert launcher.find_executable("unity") == stub
+    os.remove(stub)
+    assert launcher.find_executable("unity") == stub
+    launcher.clear_cache()
+    assert launcher.find_executable("unity") is None
+
+
+def test_missing_executable_raises(isolated_launcher):
+    pool = launcher.LauncherPool()
+    try:
+        pool.submit("unity", [])
+    except FileNotFoundError as e:
+        assert "UNITY_EXECUTABLE" in str(e)
+    else:
+        raise AssertionError("submit should fail without a Unity executable")
+
+
+def test_cap_and_fifo_across_pools(isolated_launcher, tmp_path):
+    log_path = tmp_path / "log"
+    logging_stub(isolated_launcher, "Slicer", log_path, 0.3)
+    # Two pools sharing a state directory behave like two processes
+    first = launcher.LauncherPool({"slicer": 1})
+    second = launcher.LauncherPool({"slicer": 1})
+
+    launches = [pool.submit("slicer", [str(i)]) for i, pool in enumerate([first, second, first])]
+    lines = wait_for_lines(log_path, 6)
+
+    assert lines == ["start-0", "end-0", "start-1", "end-1", "start-2", "end-2"]
+    assert launches[2].queue_wait > launches[0].queue_wait
+
+
+def test_cap_allows_parallel_instances(isolated_launcher, tmp_path):
+    log_path = tmp_path / "log"
+    logging_stub(isolated_launcher, "Slicer", log_path, 0.5)
+    pool = launcher.LauncherPool({"slicer": 2})
+
+    for i in range(3):
+        pool.submit("slicer", [str(i)])
+    lines = wait_for_lines(log_path, 6)
+
+    assert sorted(lines[:2]) == ["start-0", "start-1"]
+    assert lines.index("start-2") > min(lines.index("end-0"), lines.index("end-1"))
+
+
+def test_cap_holds_across_processes(isolated_launcher, tmp_path):
+    log_path = tmp_path / "log"
+    stub = logging_stub(isolated_launcher, "Slicer", log_path, 1.0)
+    pool = launcher.LauncherPool({"slicer": 1})
+    pool.submit("slicer", ["parent"]).wait_started(5)
+
+    # A separate process, like the one main.py starts per click, must queue behind it
+    code = (f"import launcher; launcher.LauncherPool({{'slicer': 1}}, state_dir={launcher.STATE_DIR!r})"
+            f".submit('slicer', ['child']).wait_started()")
+    env = dict(os.environ, SLICER_EXECUTABLE=stub, PYTHONPATH=os.path.dirname(launcher.__file__))
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, timeout=10)
+
+    assert wait_for_lines(log_path, 4) == ["start-parent", "end-parent", "start-child", "end-child"]
+
+
+def test_slots_of_dead_processes_are_reclaimed(isolated_launcher, tmp_path):
+    make_stub(isolated_launcher, "Slicer")
+    pool = launcher.LauncherPool({"slicer": 1})
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    with open(os.path.join(pool.state_dir, "slicer.slot-0"), "w") as f:
+        f.write(str(dead.pid))
+
+    pool.submit("slicer", []).wait_started(5)
+
+
+def test_metrics_are_shared(isolated_launcher, tmp_path):
+    make_stub(isolated_launcher, "Unity")
+    pool = launcher.LauncherPool()
+    for _ in range(2):
+        pool.submit("unity", []).wait_started(5)
+
+    metrics = launcher.LauncherPool().metrics()["unity"]
+    assert metrics["launched"] == 2
+    assert metrics["failed"] == 0
+    assert metrics["spawn_latency_max"] > 0
+    assert metrics["spawn_latency_mean"] <= metrics["spawn_latency_max"]
+
+
+def test_errors_before_spawning_fail_the_launch_and_free_its_place(isolated_launcher, monkeypatch):
+    make_stub(isolated_launcher, "Slicer")
+    pool = launcher.LauncherPool({"slicer": 1})
+    real_live_files = launcher.LauncherPool._live_files
+    calls = []
+
+    def fail_once(self, tool, kind):
+        calls.append(kind)
+        if len(calls) == 1:
+            raise OSError("state directory unreadable")
+        return real_live_files(self, tool, kind)
+
+    monkeypatch.setattr(launcher.LauncherPool, "_live_files", fail_once)
+    try:
+        pool.submit("slicer", []).wait_started(5)
+    except OSError as e:
+        assert "unreadable" in str(e)
+    else:
+        raise AssertionError("the launch should fail with the state directory error")
+    assert not any(".queue-" in name for name in os.listdir(pool.state_dir))
+
+    # Metrics failing must not leave the caller waiting either
+    monkeypatch.setattr(launcher.LauncherPool, "_record", lambda self, launch: 1 / 0)
+    assert pool.submit("slicer", []).wait_started(5) is not None
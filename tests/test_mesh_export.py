@@ -0,0 +1,81 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+import mesh_export
+
+
+def face_lines(text):
+    return [line for line in text.splitlines() if line.startswith("f ")]
+
+
+def test_faces_are_offset_and_one_based():
+    f = io.StringIO()
+    mesh_export.write_obj_faces(f, [[0, 1, 2], [2, 1, 3]], vertex_offset=4)
+    assert face_lines(f.getvalue()) == ["f 5 6 7", "f 7 6 8"]
+
+
+def test_faces_with_normals_use_their_own_offset():
+    f = io.StringIO()
+    mesh_export.write_obj_faces(f, [[0, 1, 2]], vertex_offset=4, normal_offset=10)
+    assert face_lines(f.getvalue()) == ["f 5//11 6//12 7//13"]
+
+
+def test_faces_are_written_in_chunks(monkeypatch):
+    monkeypatch.setattr(mesh_export, "CHUNK_ROWS", 2)
+    f = io.StringIO()
+    mesh_export.write_obj_faces(f, np.arange(15).reshape(5, 3), vertex_offset=0)
+    assert face_lines(f.getvalue()) == [f"f {3 * i + 1} {3 * i + 2} {3 * i + 3}" for i in range(5)]
+
+
+def triangle(with_normals):
+    points = np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]])
+    normals = np.array([[0.0, 0.0, 1.0]] * 3) if with_normals else None
+    return points, np.array([[0, 1, 2]]), normals
+
+
+def test_stream_merges_meshes_with_global_indices(tmp_path, monkeypatch):
+    # Stand-ins for vtkPolyData, polydata_arrays is the only place that needs VTK
+    meshes = {"first": triangle(True), "empty": None, "second": triangle(True)}
+    monkeypatch.setattr(mesh_export, "polydata_arrays", meshes.get)
+    save_path = str(tmp_path / "merged.obj")
+    seen = []
+
+    count = mesh_export.stream_polydata_to_obj(iter(meshes), save_path,
+                                               on_mesh=lambda points, triangles: seen.append(points))
+
+    assert count == 2
+    with open(save_path) as f:
+        text = f.read()
+    assert face_lines(text) == ["f 1//1 2//2 3//3", "f 4//4 5//5 6//6"]
+    # Points are converted from RAS to LPS
+    assert text.splitlines()[2] == "v -1.000000 -2.000000 3.000000"
+    assert np.array_equal(seen[1], [[-1, -2, 3], [-4, -5, 6], [-7, -8, 9]])
+    assert not os.path.exists(save_path + ".part")
+
+
+def test_stream_without_normals(tmp_path, monkeypatch):
+    monkeypatch.setattr(mesh_export, "polydata_arrays", lambda name: triangle(False))
+    save_path = str(tmp_path / "merged.obj")
+    mesh_export.stream_polydata_to_obj(["first", "second"], save_path)
+    with open(save_path) as f:
+        assert face_lines(f.read()) == ["f 1 2 3", "f 4 5 6"]
+
+
+def test_failure_removes_partial_file_and_keeps_old_one(tmp_path, monkeypatch):
+    monkeypatch.setattr(mesh_export, "polydata_arrays", lambda name: triangle(False))
+    save_path = str(tmp_path / "merged.obj")
+    with open(save_path, "w") as f:
+        f.write("previous export\n")
+
+    def fail(points, triangles):
+        raise ValueError("metrics failed")
+
+    with pytest.raises(ValueError):
+        mesh_export.stream_polydata_to_obj(["first"], save_path, on_mesh=fail)
+
+    assert not os.path.exists(save_path + ".part")
+    with open(save_path) as f:
+        assert f.read() == "previous export\n"
@@ -0,0 +1,139 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+import mesh_metrics
+
+
+def cube(offset=(0.0, 0.0, 0.0)):
+    """Unit cube with outward facing triangles."""
+    points = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=float) + offset
+    quads = [[0, 1, 3, 2], [4, 6, 7, 5], [0, 4, 5, 1], [2, 3, 7, 6], [0, 2, 6, 4], [1, 5, 7, 3]]
+    triangles = [[a, b, c] for a, b, c, d in quads] + [[a, c, d] for a, b, c, d in quads]
+    return points, np.array(triangles)
+
+
+def ellipsoid(a, b, c, rings=200, segments=400):
+    """UV sphere scaled to the given radii, poles included."""
+    theta = np.linspace(0, np.pi, rings + 1)[1:-1]
+    phi = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    t, p = np.meshgrid(theta, phi, indexing="ij")
+    points = np.stack([np.sin(t) * np.cos(p), np.sin(t) * np.sin(p), np.cos(t)], axis=-1).reshape(-1, 3)
+    points = np.vstack([[0, 0, 1], points, [0, 0, -1]]) * [a, b, c]
+
+    index = np.arange(1, 1 + (rings - 1) * segments).reshape(rings - 1, segments)
+    nxt = np.roll(index, -1, axis=1)
+    top = np.stack([np.zeros(segments, dtype=int), index[0], nxt[0]], axis=1)
+    bottom = np.stack([np.full(segments, len(points) - 1), nxt[-1], index[-1]], axis=1)
+    upper = np.stack([index[:-1], index[1:], nxt[1:]], axis=-1).reshape(-1, 3)
+    lower = np.stack([index[:-1], nxt[1:], nxt[:-1]], axis=-1).reshape(-1, 3)
+    return points, np.vstack([top, upper, lower, bottom])
+
+
+def reference_components(triangles, point_count):
+    parent = list(range(point_count))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for a, b, c in triangles:
+        for u, v in ((a, b), (b, c)):
+            parent[find(u)] = find(v)
+    return len({find(i) for i in np.unique(triangles)})
+
+
+def test_unit_cube():
+    metrics = mesh_metrics.mesh_metrics(*cube())
+    assert metrics["volume"] == pytest.approx(1.0)
+    assert metrics["surface_area"] == pytest.approx(6.0)
+    assert metrics["centroid"] == pytest.approx([0.5, 0.5, 0.5])
+    assert metrics["bounding_box"] == {"min": [0, 0, 0], "max": [1, 1, 1]}
+    assert metrics["component_count"] == 1
+
+
+def test_centroid_of_far_away_cube():
+    points, triangles = cube()
+    metrics = mesh_metrics.mesh_metrics(points + 1e6, triangles)
+    assert metrics["volume"] == pytest.approx(1.0)
+    assert metrics["centroid"] == pytest.approx([1e6 + 0.5] * 3)
+
+
+def test_open_surface_uses_area_centroid():
+    points = np.array([[0, 0, 0], [2, 0, 0], [2, 2, 0], [0, 2, 0]], dtype=float)
+    metrics = mesh_metrics.mesh_metrics(points, [[0, 1, 2], [0, 2, 3]])
+    assert metrics["volume"] == pytest.approx(0.0)
+    assert metrics["surface_area"] == pytest.approx(4.0)
+    assert metrics["centroid"] == pytest.approx([1, 1, 0])
+
+
+def test_two_disjoint_cubes(monkeypatch):
+    # Small chunks so the sums are accumulated over several steps
+    monkeypatch.setattr(mesh_metrics, "CHUNK_TRIANGLES", 5)
+    first, first_triangles = cube()
+    second, second_triangles = cube((3.0, 0.0, 0.0))
+    metrics = mesh_metrics.mesh_metrics(np.vstack([first, second]),
+                                        np.vstack([first_triangles, second_triangles + 8]))
+    assert metrics["volume"] == pytest.approx(2.0)
+    assert metrics["surface_area"] == pytest.approx(12.0)
+    assert metrics["centroid"] == pytest.approx([2.0, 0.5, 0.5])
+    assert metrics["component_count"] == 2
+
+
+def test_component_count_matches_reference():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        point_count = int(rng.integers(5, 200))
+        triangles = rng.integers(0, point_count, size=(int(rng.integers(1, point_count)), 3))
+        expected = reference_components(triangles, point_count)
+        assert mesh_metrics.component_count(triangles, point_count) == expected
+
+
+def test_empty_mesh():
+    metrics = mesh_metrics.mesh_metrics(np.empty((0, 3)), np.empty((0, 3)))
+    assert metrics["volume"] == 0.0
+    assert metrics["bounding_box"] is None
+    assert metrics["component_count"] == 0
+
+
+def test_combine_metrics_matches_merged_mesh():
+    first, first_triangles = cube()
+    second, second_triangles = cube((3.0, 1.0, 0.0))
+    merged = mesh_metrics.mesh_metrics(np.vstack([first, second]),
+                                       np.vstack([first_triangles, second_triangles + 8]))
+    empty = mesh_metrics.mesh_metrics(np.empty((0, 3)), np.empty((0, 3)))
+    combined = mesh_metrics.combine_metrics([mesh_metrics.mesh_metrics(first, first_triangles), empty,
+                                             mesh_metrics.mesh_metrics(second, second_triangles)])
+
+    for key in ("vertex_count", "triangle_count", "component_count"):
+        assert combined[key] == merged[key]
+    for key in ("volume", "surface_area", "centroid"):
+        assert combined[key] == pytest.approx(merged[key])
+    assert combined["bounding_box"] == merged["bounding_box"]
+    assert mesh_metrics.combine_metrics([empty])["bounding_box"] is None
+
+
+def test_ellipsoid_metrics_match_tessellation():
+    analytic = mesh_metrics.ellipsoid_metrics(3, 2, 1, [10, 20, 30])
+    points, triangles = ellipsoid(3, 2, 1)
+    measured = mesh_metrics.mesh_metrics(points + [10, 20, 30], triangles)
+
+    assert analytic["volume"] == pytest.approx(4 / 3 * math.pi * 6)
+    assert measured["volume"] == pytest.approx(analytic["volume"], rel=5e-4)
+    # Thomsen's formula is within 1.1% of the exact area
+    assert measured["surface_area"] == pytest.approx(analytic["surface_area"], rel=0.011)
+    assert measured["centroid"] == pytest.approx(analytic["centroid"])
+    assert analytic["bounding_box"] == {"min": [7, 18, 29], "max": [13, 22, 31]}
+    assert measured["component_count"] == 1
+
+
+def test_sidecar_is_written_next_to_obj(tmp_path):
+    obj_path = str(tmp_path / "model.obj")
+    path = mesh_metrics.write_sidecar(obj_path, {"volume": 1.0}, source="test")
+    assert path == str(tmp_path / "model.metrics.json")
+    with open(path) as f:
+        assert json.load(f) == {"obj": "model.obj", "coordinate_system": "LPS",
+                                "metrics": {"volume": 1.0}, "source": "test"}
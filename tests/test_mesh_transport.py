@@ -0,0 +1,127 @@
+import gc
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import mesh_transport
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def block_exists(name):
+    try:
+        block = mesh_transport._open_block(name)
+    except FileNotFoundError:
+        return False
+    block.close()
+    return True
+
+
+def assert_removed(handle):
+    assert not block_exists(handle.name)
+    assert not os.path.exists(mesh_transport._lock_path(handle.name))
+
+
+def run_worker(code, *args):
+    """Run code in a separate Python process with the repo on its path."""
+    env = dict(os.environ, PYTHONPATH=REPO_DIR)
+    return subprocess.run([sys.executable, "-c", "import sys, os, mesh_transport\n" + code] + list(args),
+                          env=env, capture_output=True, text=True, check=True, timeout=30).stdout
+
+
+@pytest.fixture
+def mesh():
+    vertices = np.arange(12, dtype=np.float32).reshape(4, 3)
+    faces = np.array([[0, 1, 2], [0, 2, 3]])
+    published = mesh_transport.publish(vertices, faces)
+    yield published
+    published.release()
+    assert_removed(published.handle)
+
+
+def test_worker_sees_the_published_arrays(mesh):
+    out = run_worker("shared = mesh_transport.attach(sys.argv[1])\n"
+                     "print(shared.vertices.sum(), shared.faces.max())\n"
+                     "shared.release()", mesh.handle.to_token())
+    assert out.split() == ["66.0", "3"]
+    assert mesh_transport.reclaim(mesh.handle) == 1
+
+
+def test_last_release_removes_block_and_lock(mesh):
+    token = mesh.handle.to_token()
+    mesh.release()
+    assert_removed(mesh.handle)
+    with pytest.raises(FileNotFoundError):
+        mesh_transport.attach(token)
+    assert_removed(mesh.handle)
+
+
+def test_worker_exiting_without_release_is_released(mesh):
+    # The finalizer releases the reference at interpreter exit
+    run_worker("shared = mesh_transport.attach(sys.argv[1])", mesh.handle.to_token())
+    assert mesh_transport.reclaim(mesh.handle) == 1
+
+
+def test_worker_killed_without_release_is_reclaimed(mesh):
+    run_worker("shared = mesh_transport.attach(sys.argv[1])\nos._exit(0)", mesh.handle.to_token())
+    # The dead worker still holds an entry until someone looks at the table
+    assert mesh_transport.reclaim(mesh.handle) == 1
+
+
+def test_mesh_of_dead_publisher_is_reclaimed():
+    token = run_worker("mesh = mesh_transport.publish([[1.0, 2.0, 3.0]], [[0, 0, 0]])\n"
+                       "print(mesh.handle.to_token())\n"
+                       "sys.stdout.flush()\n"
+                       "os._exit(0)").strip()
+    handle = mesh_transport.MeshHandle.from_token(token)
+    assert block_exists(handle.name)
+    assert mesh_transport.reclaim(handle) == 0
+    assert_removed(handle)
+
+
+def test_attach_to_mesh_of_dead_publisher_fails_and_cleans_up():
+    token = run_worker("mesh = mesh_transport.publish([[1.0, 2.0, 3.0]], [[0, 0, 0]])\n"
+                       "print(mesh.handle.to_token())\n"
+                       "sys.stdout.flush()\n"
+                       "os._exit(0)").strip()
+    with pytest.raises(FileNotFoundError):
+        mesh_transport.attach(token)
+    assert_removed(mesh_transport.MeshHandle.from_token(token))
+
+
+def test_views_stay_readable_after_release(mesh):
+    attached = mesh_transport.attach(mesh.handle)
+    vertices = attached.vertices[1:]
+    faces = attached.faces
+    attached.release()
+    mesh.release()
+    assert_removed(mesh.handle)
+
+    assert vertices.sum() == 63.0
+    assert faces.max() == 3
+    del attached
+    gc.collect()
+    assert vertices[-1].tolist() == [9.0, 10.0, 11.0]
+
+
+def test_garbage_collected_mesh_is_released(mesh):
+    attached = mesh_transport.attach(mesh.handle)
+    assert mesh_transport.reclaim(mesh.handle) == 2
+    del attached
+    gc.collect()
+    assert mesh_transport.reclaim(mesh.handle) == 1
+
+
+def test_reference_limit(mesh):
+    attached = [mesh_transport.attach(mesh.handle) for _ in range(mesh_transport.MAX_REFERENCES - 1)]
+    with pytest.raises(RuntimeError):
+        mesh_transport.attach(mesh.handle)
+
+    attached.pop().release()
+    attached.append(mesh_transport.attach(mesh.handle))
+    for shared in attached:
+        shared.release()
+    assert mesh_transport.reclaim(mesh.handle) == 1
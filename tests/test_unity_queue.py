@@ -0,0 +1,187 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import launcher
+import unity_queue
+from conftest import make_stub
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def queue_dir(isolated_launcher, tmp_path, monkeypatch):
+    monkeypatch.setattr(unity_queue, "_timer", None)
+    monkeypatch.setattr(unity_queue, "_recheck_timer", None)
+    monkeypatch.setattr(unity_queue, "_project_path", str(tmp_path / "project"))
+    monkeypatch.setenv("UNITY_HANDOFF", "queue")
+    path = tmp_path / "queue"
+    path.mkdir()
+    yield str(path)
+    for timer in (unity_queue._timer, unity_queue._recheck_timer):
+        if timer is not None:
+            timer.cancel()
+
+
+def stub_consumer(bin_dir, idle=0.5):
+    """Unity stand-in that runs unity_stub_consumer.py with the arguments it was given."""
+    consumer = os.path.join(REPO_DIR, "unity_stub_consumer.py")
+    return make_stub(bin_dir, "Unity", f"sys.path.insert(0, {REPO_DIR!r})\n"
+                                       f"sys.argv += ['--idle', '{idle}']\n"
+                                       f"import runpy\nrunpy.run_path({consumer!r}, run_name='__main__')")
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+def imported(queue_dir):
+    path = os.path.join(queue_dir, "imported.log")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [line.split() for line in f]
+
+
+def unity_launches():
+    return launcher.LauncherPool().metrics()["unity"]["launched"]
+
+
+def test_requests_within_window_are_coalesced(isolated_launcher, queue_dir):
+    stub_consumer(isolated_launcher)
+    for i in range(3):
+        unity_queue.enqueue_obj(f"/objs/a{i}.obj", queue_dir=queue_dir, window=0.3)
+
+    wait_until(lambda: len(imported(queue_dir)) == 3)
+    batches = {batch for batch, _ in imported(queue_dir)}
+    assert len(batches) == 1
+    assert [path for _, path in imported(queue_dir)] == [f"/objs/a{i}.obj" for i in range(3)]
+    assert unity_launches() == 1
+    # Consumed batches are deleted
+    assert not [name for name in os.listdir(queue_dir) if name.startswith("batch-")]
+
+
+def test_batches_are_imported_in_order_by_one_consumer(isolated_launcher, queue_dir, monkeypatch):
+    stub_consumer(isolated_launcher, idle=2.0)
+    unity_queue.enqueue_obj("/objs/first.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    wait_until(lambda: len(imported(queue_dir)) == 1)
+
+    # The running consumer's heartbeat stops a second launch
+    unity_queue.enqueue_obj("/objs/second.obj", queue_dir=queue_dir)
+    unity_queue.enqueue_obj("/objs/third.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    wait_until(lambda: len(imported(queue_dir)) == 3)
+
+    rows = imported(queue_dir)
+    assert [path for _, path in rows] == ["/objs/first.obj", "/objs/second.obj", "/objs/third.obj"]
+    assert rows[0][0] < rows[1][0] == rows[2][0]
+    assert unity_launches() == 1
+
+
+def test_consumer_exit_handshake(isolated_launcher, queue_dir):
+    stub_consumer(isolated_launcher, idle=0.3)
+    heartbeat = os.path.join(queue_dir, unity_queue.HEARTBEAT_NAME)
+    unity_queue.enqueue_obj("/objs/a.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    wait_until(lambda: len(imported(queue_dir)) == 1)
+    assert not os.path.exists(os.path.join(queue_dir, unity_queue.MARKER_NAME))
+
+    # Once idle the consumer removes its heartbeat, so the next batch relaunches it
+    wait_until(lambda: not os.path.exists(heartbeat))
+    wait_until(lambda: launcher.LauncherPool().metrics()["unity"]["running"] == 0)
+    assert not unity_queue.consumer_running(queue_dir)
+    unity_queue.enqueue_obj("/objs/b.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    wait_until(lambda: len(imported(queue_dir)) == 2)
+    assert unity_launches() == 2
+
+
+def test_consumer_rechecks_after_dropping_heartbeat(queue_dir, monkeypatch):
+    import unity_stub_consumer
+    heartbeat = os.path.join(queue_dir, unity_queue.HEARTBEAT_NAME)
+    real_remove = os.remove
+    late_batch = os.path.join(queue_dir, "batch-99999999999999999999-1.jsonl")
+
+    def remove_then_flush(path):
+        real_remove(path)
+        if path == heartbeat and not os.path.exists(late_batch + ".seen"):
+            # A producer flushes right after the heartbeat went away
+            open(late_batch + ".seen", "w").close()
+            with open(late_batch, "w") as f:
+                f.write('{"seq": 1, "pid": 1, "path": "/objs/late.obj"}\n')
+
+    monkeypatch.setattr(unity_stub_consumer.os, "remove", remove_then_flush)
+    unity_stub_consumer.consume(queue_dir, idle_timeout=0.0, poll_interval=0.01)
+
+    assert [path for _, path in imported(queue_dir)] == ["/objs/late.obj"]
+    assert not os.path.exists(heartbeat)
+
+
+def test_marker_is_cleared_when_editor_exits_without_consuming(isolated_launcher, queue_dir):
+    make_stub(isolated_launcher, "Unity")  # exits straight away
+    marker = os.path.join(queue_dir, unity_queue.MARKER_NAME)
+    unity_queue.enqueue_obj("/objs/a.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+
+    wait_until(lambda: not os.path.exists(marker))
+    assert not unity_queue.consumer_running(queue_dir)
+    unity_queue.enqueue_obj("/objs/b.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    wait_until(lambda: unity_launches() == 2)
+
+
+def test_stale_heartbeat_of_a_dead_consumer_is_rechecked(isolated_launcher, queue_dir, monkeypatch):
+    monkeypatch.setattr(unity_queue, "HEARTBEAT_TIMEOUT", 0.5)
+    stub_consumer(isolated_launcher)
+    # Left behind by an editor that crashed a moment ago
+    unity_queue.touch_heartbeat(queue_dir)
+    unity_queue.enqueue_obj("/objs/a.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+    assert unity_launches() == 0
+
+    wait_until(lambda: len(imported(queue_dir)) == 1)
+    assert unity_launches() == 1
+
+
+def test_file_mode_launches_import_per_file(isolated_launcher, queue_dir, tmp_path, monkeypatch):
+    monkeypatch.setenv("UNITY_HANDOFF", "file")
+    log_path = str(tmp_path / "argv.log")
+    make_stub(isolated_launcher, "Unity", f"open({log_path!r}, 'a').write(' '.join(sys.argv[1:]) + '\\n')")
+    unity_queue.enqueue_obj("/objs/a.obj", queue_dir=queue_dir)
+    unity_queue.enqueue_obj("/objs/b.obj", queue_dir=queue_dir)
+    unity_queue.flush(queue_dir)
+
+    def lines():
+        return open(log_path).read().splitlines() if os.path.exists(log_path) else []
+    wait_until(lambda: len(lines()) == 2)
+    project = unity_queue._project_path
+    assert lines() == [f"-projectPath {project} -executeMethod ImportObj.ImportObjFile --filePath /objs/{name}.obj"
+                       for name in "ab"]
+    assert not [name for name in os.listdir(queue_dir) if name.startswith("batch-")]
+
+
+def test_no_entry_is_lost_to_concurrent_flushes(queue_dir, monkeypatch):
+    monkeypatch.setattr(unity_queue, "consumer_running", lambda queue_dir=None: True)
+    code = (f"import unity_queue\n"
+            f"for i in range(200):\n"
+            f"    unity_queue.enqueue_obj(f'/objs/{{i}}.obj', queue_dir={queue_dir!r}, window=1000)\n")
+    env = dict(os.environ, PYTHONPATH=REPO_DIR, UNITY_HANDOFF="queue")
+    producer = subprocess.Popen([sys.executable, "-c", code], env=env, stdout=subprocess.DEVNULL)
+    while producer.poll() is None:
+        unity_queue.flush(queue_dir)
+    unity_queue.flush(queue_dir)
+
+    paths = []
+    for name in sorted(os.listdir(queue_dir)):
+        if name.startswith("batch-"):
+            paths += [entry["path"] for entry in unity_queue.read_batch(os.path.join(queue_dir, name))]
+    assert paths == [f"/objs/{i}.obj" for i in range(200)]
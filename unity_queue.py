@@ -0,0 +1,259 @@
+"""Hand-off queue that batches OBJ exports before they go to Unity.
+
+Exports are appended to QUEUE_DIR/pending.jsonl, one JSON line per OBJ. Once the
+coalescing window has passed, the pending file is renamed to a batch file
+(batch-<time_ns>-<pid>.jsonl). Appends and renames from every process happen
+under queue.lock, so no entry can land in a batch after it was closed.
+
+What happens to a batch depends on the hand-off mode, set with "unity_handoff"
+in launcher_config.json or the UNITY_HANDOFF environment variable:
+
+"file" (default) launches Unity with -executeMethod ImportObj.ImportObjFile
+--filePath <obj> for each OBJ in the batch, the same hand-off as before.
+
+"queue" launches Unity once, unless an editor is already consuming the queue:
+
+    -projectPath <project> -executeMethod ImportObj.ImportObjQueue --queueDir <QUEUE_DIR>
+
+The consumer (ImportObj.ImportObjQueue in the Unity project, or
+unity_stub_consumer.py) must:
+  * delete launch.marker when it starts,
+  * touch consumer.heartbeat at least every HEARTBEAT_TIMEOUT / 2 seconds,
+  * import the batch files in name order and the lines of each in file order,
+    deleting each batch once imported,
+  * before exiting, delete the heartbeat and then check for batch files once more.
+
+A consumer that dies without deleting its heartbeat looks alive until the
+heartbeat is HEARTBEAT_TIMEOUT old, so while batches are waiting the queue is
+checked again after that long and a new editor is launched if needed.
+"""
+import json
+import os
+import threading
+import time
+
+import interprocess
+import launcher
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+QUEUE_DIR = os.environ.get("UNITY_QUEUE_DIR", os.path.join(SCRIPT_DIR, "Obj_files", "unity_queue"))
+PROJECT_PATH = os.path.join(SCRIPT_DIR, "Unity", "FYP_Testing")
+FILE_METHOD = "ImportObj.ImportObjFile"
+QUEUE_METHOD = "ImportObj.ImportObjQueue"
+
+COALESCE_WINDOW = float(os.environ.get("UNITY_COALESCE_WINDOW", "2.0"))  # seconds
+HEARTBEAT_TIMEOUT = 10.0  # a consumer silent for longer than this is treated as gone
+STARTUP_TIMEOUT = 600.0  # how long a launched editor may take before it starts consuming
+
+PENDING_NAME = "pending.jsonl"
+HEARTBEAT_NAME = "consumer.heartbeat"
+MARKER_NAME = "launch.marker"
+LOCK_NAME = "queue.lock"
+
+_lock = threading.Lock()
+_timer = None
+_recheck_timer = None
+_project_path = PROJECT_PATH
+
+
+def _path(name, queue_dir=None):
+    return os.path.join(queue_dir or QUEUE_DIR, name)
+
+
+def _age(path):
+    """Seconds since path was last modified, or None if it does not exist."""
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def handoff_mode():
+    """"file" or "queue", see the module docstring."""
+    mode = os.environ.get("UNITY_HANDOFF") or launcher.load_config().get("unity_handoff", "file")
+    if mode not in ("file", "queue"):
+        print(f"Unknown Unity hand-off mode {mode!r}, using 'file'")
+        return "file"
+    return mode
+
+
+def enqueue_obj(obj_path, project_path=None, queue_dir=None, window=None):
+    """Queue an OBJ for import into Unity.
+
+    Requests arriving within the coalescing window are handed to Unity as one batch.
+    """
+    global _timer, _project_path
+    queue_dir = queue_dir or QUEUE_DIR
+    os.makedirs(queue_dir, exist_ok=True)
+
+    entry = {"seq": time.time_ns(), "pid": os.getpid(), "path": os.path.abspath(obj_path)}
+    line = (json.dumps(entry) + "\n").encode("utf-8")
+
+    with _lock:
+        with interprocess.locked(_path(LOCK_NAME, queue_dir)):
+            fd = os.open(_path(PENDING_NAME, queue_dir), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        print(f"Queued {obj_path} for Unity import")
+
+        if project_path:
+            _project_path = project_path
+        if _timer is None:
+            _timer = threading.Timer(COALESCE_WINDOW if window is None else window, flush, args=(queue_dir,))
+            _timer.daemon = True
+            _timer.start()
+
+
+def flush(queue_dir=None):
+    """Close the pending batch now and hand it to Unity.
+
+    Returns the batch file path, or None if nothing was pending.
+    """
+    global _timer
+    queue_dir = queue_dir or QUEUE_DIR
+
+    with _lock:
+        if _timer is not None:
+            _timer.cancel()
+            _timer = None
+
+        with interprocess.locked(_path(LOCK_NAME, queue_dir)):
+            batch_path = _path(f"batch-{time.time_ns():020d}-{os.getpid()}.jsonl", queue_dir)
+            try:
+                os.rename(_path(PENDING_NAME, queue_dir), batch_path)
+            except FileNotFoundError:
+                # Another producer already picked up everything that was pending
+                return None
+
+            if handoff_mode() == "file":
+                _import_files(batch_path)
+            else:
+                # The batch must exist before the consumer check, see the module docstring
+                _ensure_consumer(queue_dir)
+        return batch_path
+
+
+def _ensure_consumer(queue_dir):
+    # Caller holds _lock and the queue lock
+    global _recheck_timer
+    if not pending_batches(queue_dir):
+        return
+    if not consumer_running(queue_dir):
+        _start_consumer(queue_dir)
+    elif _recheck_timer is None:
+        # The consumer may have died without deleting its heartbeat, look again once it is stale
+        _recheck_timer = threading.Timer(HEARTBEAT_TIMEOUT, _recheck_consumer, args=(queue_dir,))
+        _recheck_timer.daemon = True
+        _recheck_timer.start()
+
+
+def _recheck_consumer(queue_dir):
+    global _recheck_timer
+    with _lock:
+        _recheck_timer = None
+        try:
+            with interprocess.locked(_path(LOCK_NAME, queue_dir)):
+                _ensure_consumer(queue_dir)
+        except OSError as e:
+            print(f"Failed to check the Unity import queue: {e}")
+
+
+def _import_files(batch_path):
+    for entry in read_batch(batch_path):
+        print(f"Launching Unity project at {_project_path} with method {FILE_METHOD} and file {entry['path']}...")
+        try:
+            launcher.launch("unity", ["-projectPath", _project_path, "-executeMethod", FILE_METHOD,
+                                      "--filePath", entry["path"]])
+        except Exception as e:
+            print(f"Failed to launch Unity project: {e}")
+    remove_batch(batch_path)
+
+
+def consumer_running(queue_dir=None):
+    """True if a consumer is polling the queue or an editor launch is still starting up."""
+    heartbeat_age = _age(_path(HEARTBEAT_NAME, queue_dir))
+    if heartbeat_age is not None and heartbeat_age < HEARTBEAT_TIMEOUT:
+        return True
+    marker = _path(MARKER_NAME, queue_dir)
+    marker_age = _age(marker)
+    if marker_age is None:
+        return False
+    # The marker holds the PID of the launching process, then of the editor once it runs
+    if marker_age < STARTUP_TIMEOUT and interprocess.pid_alive(interprocess.read_pid(marker)):
+        return True
+    _remove_marker(marker)
+    return False
+
+
+def _remove_marker(marker, pid=None):
+    """Remove the launch marker, but only if it still belongs to pid when one is given."""
+    if pid is not None and interprocess.read_pid(marker) != pid:
+        return
+    try:
+        os.remove(marker)
+    except FileNotFoundError:
+        pass
+
+
+def _start_consumer(queue_dir):
+    marker = _path(MARKER_NAME, queue_dir)
+    try:
+        fd = os.open(marker, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        # Another producer is launching the editor right now
+        return
+    os.write(fd, str(os.getpid()).encode("utf-8"))
+    os.close(fd)
+
+    print(f"Launching Unity project at {_project_path} to import queued files from {queue_dir}...")
+    try:
+        launch = launcher.launch("unity", ["-projectPath", _project_path, "-executeMethod", QUEUE_METHOD,
+                                           "--queueDir", queue_dir])
+    except Exception as e:
+        _remove_marker(marker)
+        print(f"Failed to launch Unity project: {e}")
+        return
+    threading.Thread(target=_watch_editor, args=(launch, marker), daemon=True).start()
+
+
+def _watch_editor(launch, marker):
+    try:
+        process = launch.wait_started()
+    except Exception as e:
+        _remove_marker(marker, os.getpid())
+        print(f"Failed to launch Unity project: {e}")
+        return
+    if os.path.exists(marker):
+        interprocess.write_pid(marker, process.pid)
+    while process.poll() is None:
+        time.sleep(0.5)
+    # A consumer deletes the marker when it starts. If it is still here the editor
+    # exited without consuming, so let the next flush launch a new one.
+    _remove_marker(marker, process.pid)
+
+
+# Consumer side helpers, used by unity_stub_consumer.py
+
+def touch_heartbeat(queue_dir=None):
+    with open(_path(HEARTBEAT_NAME, queue_dir), "w") as f:
+        f.write(str(os.getpid()))
+
+
+def pending_batches(queue_dir=None):
+    """Unconsumed batch files in the order they must be imported."""
+    queue_dir = queue_dir or QUEUE_DIR
+    names = sorted(n for n in os.listdir(queue_dir) if n.startswith("batch-") and n.endswith(".jsonl"))
+    return [os.path.join(queue_dir, n) for n in names]
+
+
+def read_batch(batch_path):
+    """The queued entries of a batch file, in the order they were queued."""
+    with open(batch_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def remove_batch(batch_path):
+    """Delete a batch once all of its entries have been imported."""
+    os.remove(batch_path)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Stand-in for the Unity editor that consumes the OBJ hand-off queue.
+
+Accepts the same arguments unity_queue passes to Unity, so it can be used as the
+Unity executable (UNITY_EXECUTABLE=unity_stub_consumer.py). Instead of importing
+each OBJ it appends its path to imported.log in the queue directory.
+"""
+import argparse
+import os
+import time
+
+import unity_queue
+
+
+def consume(queue_dir, idle_timeout=2.0, import_delay=0.0, poll_interval=0.1):
+    marker = os.path.join(queue_dir, unity_queue.MARKER_NAME)
+    heartbeat = os.path.join(queue_dir, unity_queue.HEARTBEAT_NAME)
+    log_path = os.path.join(queue_dir, "imported.log")
+
+    unity_queue.touch_heartbeat(queue_dir)
+    if os.path.exists(marker):
+        os.remove(marker)
+
+    idle_since = time.monotonic()
+    while True:
+        unity_queue.touch_heartbeat(queue_dir)
+        batches = unity_queue.pending_batches(queue_dir)
+
+        if not batches and time.monotonic() - idle_since > idle_timeout:
+            # Remove the heartbeat first, then look once more so a batch
+            # flushed in between is not left behind
+            os.remove(heartbeat)
+            if not unity_queue.pending_batches(queue_dir):
+                break
+            continue
+
+        for batch_path in batches:
+            entries = unity_queue.read_batch(batch_path)
+            print(f"Importing {len(entries)} file(s) from {os.path.basename(batch_path)}")
+            with open(log_path, "a") as log:
+                for entry in entries:
+                    time.sleep(import_delay)
+                    log.write(f"{os.path.basename(batch_path)} {entry['path']}\n")
+            unity_queue.remove_batch(batch_path)
+            idle_since = time.monotonic()
+
+        time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-projectPath", help="Ignored, accepted for compatibility with Unity")
+    parser.add_argument("-executeMethod", help="Ignored, accepted for compatibility with Unity")
+    parser.add_argument("--queueDir", default=unity_queue.QUEUE_DIR)
+    parser.add_argument("--idle", type=float, default=2.0, help="Exit after this many idle seconds")
+    parser.add_argument("--import-delay", type=float, default=0.0, help="Simulated seconds per import")
+    args = parser.parse_args()
+
+    consume(args.queueDir, idle_timeout=args.idle, import_delay=args.import_delay)
+
+
+if __name__ == "__main__":
+    main()